@@ -1,102 +1,205 @@
 import ast
+import functools
+import hashlib
+import io
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Edit kinds, ordered so an insertion lands before a removal on the same line
+_INSERT = 0
+_REMOVE = 1
+
+# Fixed section headers of the generated docstring
+_ARGS_HEADER = "Args:\n" + "-" * len("Args") + "\n"
+_RETURNS_HEADER = "\nReturns:\n" + "-" * len("Returns") + "\n"
+
+# Markers for file contents already known to need no fixes; bump the version
+# whenever the fixing rules change so stale markers are ignored
+_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "docstring-checker"
+    / "v2"
+)
+
+# Body indentation per function col_offset; only a few distinct values occur
+_INDENT_CACHE = {}
+
+# Fields holding nested statements (or handlers/cases that hold statements)
+_BODY_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+@functools.lru_cache(maxsize=4096)
+def _render_docstring(description, params, returns_annotation):
+    """Render the docstring template; functions of the same shape share the result."""
+    parts = ['"""', f"\n{description}\n\n"]
+
+    if params:
+        parts.append(_ARGS_HEADER)
+        parts.append("".join(f"    {param} (TYPE): Description.\n" for param in params))
+
+    parts.append(_RETURNS_HEADER)
+    parts.append(f"    {returns_annotation}: Description.\n")
+    parts.append('\n"""')
+    return "".join(parts)
+
 def generate_docstring(func_node, existing_docstring=None):
     """Generate a properly formatted docstring with dynamically sized underlines."""
-    params = [arg.arg for arg in func_node.args.args]
-    returns_annotation = (
-        getattr(func_node.returns, "id", None)
-        or getattr(func_node.returns, "attr", None)
-        or "None"
-    ) if func_node.returns else "None"
+    params = tuple(arg.arg for arg in func_node.args.args)
+    returns_annotation = ast.unparse(func_node.returns) if func_node.returns is not None else "None"
 
     # Use the existing docstring if present; otherwise, create placeholder text
     description = existing_docstring or f"{func_node.name.replace('_', ' ').capitalize()} function."
-    docstring = '"""' + f"\n{description}\n\n"
-
-    if params:
-        docstring += "Args:\n" + "-" * len("Args") + "\n"
-        for param in params:
-            docstring += f"    {param} (TYPE): Description.\n"
-
-    docstring += "\nReturns:\n" + "-" * len("Returns") + "\n"
-    docstring += f"    {returns_annotation}: Description.\n"
-    docstring += '\n"""'
-    return docstring
+    return _render_docstring(description, params, returns_annotation)
+
+@functools.lru_cache(maxsize=None)
+def _body_fields(node_type):
+    """Return the statement-list fields a node type has; empty for leaf statements."""
+    return tuple(field for field in _BODY_FIELDS if field in node_type._fields)
+
+def _mark_clean(marker):
+    """Record that a file's contents need no fixes; the cache is best effort."""
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError:
+        pass
+
+def _write_file(file_path, payload):
+    """Write bytes straight to a file descriptor, bypassing Python's io stack."""
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _fix_function(node, edits):
+    """Queue the edits that give a function a generated docstring."""
+    # Skip if name starts with '_' (private) or is a magic method (dunder)
+    if (
+        node.name.startswith('_')  # private method
+        or (node.name.startswith('__') and node.name.endswith('__'))  # magic
+    ):
+        return
+
+    first_body_item = node.body[0] if node.body else None
+
+    # Check if the first body statement is actually a docstring (a bare string literal)
+    has_proper_docstring = (
+        type(first_body_item) is ast.Expr
+        and type(first_body_item.value) is ast.Constant
+        and type(first_body_item.value.value) is str
+    )
+
+    existing_docstring = None
+    if has_proper_docstring:
+        # Extract the existing docstring text
+        existing_docstring = first_body_item.value.value.strip()
+
+        # Remove ALL lines occupied by the original docstring
+        # Note: end_lineno is 1-based inclusive, which is the 0-based exclusive end
+        start_line = first_body_item.lineno - 1  # -1 because list is 0-based vs AST is 1-based
+        end_line = first_body_item.end_lineno
+        edits.append((start_line, _REMOVE, end_line))
+
+    # Generate a new docstring (either from existing text or a placeholder)
+    new_docstring = generate_docstring(node, existing_docstring)
+
+    # Decide where to insert the new docstring
+    # If we had a docstring, insert at the old docstring's start line
+    # Otherwise, insert right after the function definition line
+    insert_position = (
+        first_body_item.lineno - 1 if has_proper_docstring
+        else node.lineno
+    )
+
+    # Indent the docstring to match function body
+    indentation = _INDENT_CACHE.get(node.col_offset)
+    if indentation is None:
+        indentation = _INDENT_CACHE[node.col_offset] = " " * (node.col_offset + 4)
+    edits.append((insert_position, _INSERT, f"{indentation}{new_docstring}\n"))
+
+# Per-node-type handlers for the function walk, looked up by exact type
+_HANDLERS = {
+    ast.FunctionDef: _fix_function,
+    ast.AsyncFunctionDef: _fix_function,
+}
 
 def check_and_fix_docstrings(file_path):
     """Check and fix function docstrings in a given file."""
-    with open(file_path, "r", encoding="utf-8") as file:
-        source_code = file.readlines()
-
-    tree = ast.parse("".join(source_code), filename=file_path)
-    updated_lines = list(source_code)
-
-    insertions = []
-    removals = []
-
-    for node in ast.walk(tree):
-        # 1) Must be a FunctionDef
-        # 2) Skip if name starts with '_' (private) or is a magic method (dunder)
-        if (
-            isinstance(node, ast.FunctionDef)
-            and not (
-                node.name.startswith('_')  # private method
-                or (node.name.startswith('__') and node.name.endswith('__'))  # magic
-            )
-        ):
-            first_body_item = node.body[0] if node.body else None
-            
-            # Check if the first body statement is actually a docstring
-            has_proper_docstring = (
-                first_body_item
-                and isinstance(first_body_item, ast.Expr)
-                and isinstance(getattr(first_body_item, 'value', None), (ast.Str, ast.Constant))
-            )
-            
-            existing_docstring = None
-            if has_proper_docstring:
-                # Extract the existing docstring text
-                existing_docstring = first_body_item.value.s.strip()
-                
-                # Remove ALL lines occupied by the original docstring
-                # Note: end_lineno is inclusive, so we do (+1) in the slice to remove that line too
-                start_line = first_body_item.lineno - 1  # -1 because list is 0-based vs AST is 1-based
-                end_line = first_body_item.end_lineno
-                removals.append((start_line, end_line + 1))
-
-            # Generate a new docstring (either from existing text or a placeholder)
-            new_docstring = generate_docstring(node, existing_docstring)
-
-            # Decide where to insert the new docstring
-            # If we had a docstring, insert at the old docstring's start line
-            # Otherwise, insert right after the function definition line
-            insert_position = (
-                first_body_item.lineno - 1 if has_proper_docstring
-                else node.lineno
-            )
-
-            # Indent the docstring to match function body
-            indentation = " " * (node.col_offset + 4)
-            insertions.append((insert_position, f"{indentation}{new_docstring}\n"))
-
-    # Apply removals in reverse
-    for start, end in sorted(removals, reverse=True):
-        del updated_lines[start:end]
-
-    # Apply insertions in reverse
-    for pos, text in sorted(insertions, reverse=True):
-        updated_lines.insert(pos, text)
-
-    with open(file_path, "w", encoding="utf-8") as file:
-        file.writelines(updated_lines)
-
-def main():
+    file_path = Path(file_path)
+    data = file_path.read_bytes()
+    # No function definitions possible, so nothing to fix (also covers "async def")
+    if b"def" not in data:
+        return
+
+    # Unchanged since a previous run found nothing to fix
+    marker = _CACHE_DIR / f"{hashlib.blake2b(data, digest_size=16).hexdigest()}.ok"
+    if marker.exists():
+        return
+
+    # What ast.parse wraps, minus its Python-level wrapper; type comments stay off
+    tree = compile(data, str(file_path), "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+
+    # Universal-newline split on \n/\r\n/\r only, matching the AST's line numbers
+    # (str.splitlines would also break on form feeds and other separators)
+    source = data.decode("utf-8")
+    source_code = io.StringIO(source, newline=None).readlines()
+
+    # (line index, kind, payload) events, all in original line coordinates
+    edits = []
+
+    # Functions are only ever defined by statements, so walk statement bodies
+    # and never descend into expression subtrees
+    # (push/pop are bound once; attribute lookups dominate this loop)
+    stack = [tree]
+    push, pop = stack.extend, stack.pop
+    while stack:
+        node = pop()
+        for field in _body_fields(type(node)):
+            push(getattr(node, field))
+
+        handler = _HANDLERS.get(type(node))
+        if handler is not None:
+            handler(node, edits)
+
+    # Nothing to fix; leave the file (and its mtime) untouched
+    if not edits:
+        _mark_clean(marker)
+        return
+
+    # Rebuild the file in one forward pass instead of patching the list in place
+    updated_lines = []
+    cursor = 0
+    for line, kind, payload in sorted(edits):
+        if line > cursor:
+            updated_lines.extend(source_code[cursor:line])
+            cursor = line
+        if kind == _INSERT:
+            updated_lines.append(payload)
+        else:
+            cursor = max(cursor, payload)
+    updated_lines.extend(source_code[cursor:])
+
+    new_source = "".join(updated_lines)
+    if new_source != source:
+        # One encoded payload, handed to the OS in a single write
+        _write_file(file_path, new_source.encode("utf-8"))
+
+def main(argv=None):
     """Main function to check and fix docstrings in Python files."""
-    files_to_check = [Path(f) for f in sys.argv[1:] if f.endswith(".py")]
-    for file in files_to_check:
-        check_and_fix_docstrings(file)
+    if argv is None:
+        argv = sys.argv[1:]
+    files_to_check = [Path(f) for f in argv if f.endswith(".py")]
+    if len(files_to_check) > 1:
+        # Files are independent; spread them over worker processes
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(check_and_fix_docstrings, files_to_check, chunksize=8))
+    else:
+        for file in files_to_check:
+            check_and_fix_docstrings(file)
     print("✅ Docstring checks complete. Private and magic methods were skipped.")
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ setup(
     name="docstring_checker",
     version="0.1.0",
     py_modules=["check_docstrings"],
+    python_requires=">=3.9",
     install_requires=[],
     entry_points={
         "console_scripts": ["check-docstrings=check_docstrings:main"],